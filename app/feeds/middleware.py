@@ -17,7 +17,9 @@ class RelayMetadataMiddleware:
     - All API responses get consistent caching headers
     - Headers are added even when serving cached responses
     - The ETag and Last-Modified come from RelayMetadata (updated by scan_feeds)
-    - All clients see the same cache version across all endpoints
+    - All clients see the same cache version across all endpoints, unless a
+      view sets its own content-based ETag for conditional GET or streams its
+      body, which is not known when the headers are sent
     - Metadata is cached to avoid DB queries on every request
     """
 
@@ -47,7 +49,10 @@ class RelayMetadataMiddleware:
                     logger.debug("Using cached relay metadata")
 
                 etag, last_modified = cached_data
-                response["ETag"] = f'"{etag}"'
+                # Views that compute their own content ETag keep it, and
+                # streamed bodies get none as they are not known up front
+                if not response.has_header("ETag") and not response.streaming:
+                    response["ETag"] = f'"{etag}"'
                 response["Last-Modified"] = last_modified.strftime(
                     "%a, %d %b %Y %H:%M:%S GMT"
                 )
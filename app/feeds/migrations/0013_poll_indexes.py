@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0012_delete_bridge_feeds"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pollvote",
+            index=models.Index(
+                fields=["poll_post", "-created_at"], name="pollvote_poll_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("poll_end__isnull", False)),
+                fields=["profile", "-created_at"],
+                name="post_poll_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("poll_end__isnull", False)),
+                fields=["-created_at"],
+                name="post_poll_all_idx",
+            ),
+        ),
+    ]
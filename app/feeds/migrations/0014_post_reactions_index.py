@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0013_poll_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("mood", ""), _negated=True),
+                fields=["reply_to", "mood"],
+                name="post_replyto_mood_idx",
+            ),
+        ),
+    ]
@@ -157,6 +157,25 @@ class Post(models.Model):
     class Meta:
         unique_together = ["profile", "post_id"]
         ordering = ["-created_at"]
+        indexes = [
+            # Polls of a feed and all polls, both newest first
+            models.Index(
+                fields=["profile", "-created_at"],
+                condition=models.Q(poll_end__isnull=False),
+                name="post_poll_feed_idx",
+            ),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(poll_end__isnull=False),
+                name="post_poll_all_idx",
+            ),
+            # Reactions (posts with a mood) to a given post
+            models.Index(
+                fields=["reply_to", "mood"],
+                condition=~models.Q(mood=""),
+                name="post_replyto_mood_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.profile.nick}: {self.content[:50]}..."
@@ -210,6 +229,12 @@ class PollVote(models.Model):
 
     class Meta:
         unique_together = ["post", "poll_post"]
+        indexes = [
+            # Votes of a poll, newest first
+            models.Index(
+                fields=["poll_post", "-created_at"], name="pollvote_poll_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.post.profile.nick} voted {self.poll_option}"
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+LOCMEM_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+class LocMemCacheMixin:
+    """Run each test against an empty local-memory cache.
+
+    DEBUG uses DummyCache, so tests about caching need a real backend. The
+    cache is cleared before every test and again afterwards, even when the
+    test fails. Subclasses overriding setUp must call super().setUp().
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.enterClassContext(override_settings(CACHES=LOCMEM_CACHES))
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
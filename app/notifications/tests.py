@@ -1,31 +1,36 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
 from django.test import TestCase
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
 
-from app.feeds.models import Profile, Post, Mention
+from app.feeds.models import Profile, Post, Mention, PollVote
+from app.feeds.testing import LocMemCacheMixin
+from app.notifications import views as notifications_views
+from app.notifications.views import NotificationsView
 
 
-class NotificationsViewTest(TestCase):
+class NotificationsViewTest(LocMemCacheMixin, TestCase):
     """Test cases for the NotificationsView API using Given/When/Then structure."""
 
-    def setUp(self):
-        self.client = APIClient()
-        self.notifications_url = "/notifications/"
-
+    @classmethod
+    def setUpTestData(cls):
         # Create test profiles
-        self.profile1 = Profile.objects.create(
+        cls.profile1 = Profile.objects.create(
             feed="https://example.com/social.org",
             title="Example Profile",
             nick="example_user",
             description="Test profile 1",
         )
-        self.profile2 = Profile.objects.create(
+        cls.profile2 = Profile.objects.create(
             feed="https://test.com/social.org",
             title="Test Profile",
             nick="test_user",
             description="Test profile 2",
         )
-        self.profile3 = Profile.objects.create(
+        cls.profile3 = Profile.objects.create(
             feed="https://third.com/social.org",
             title="Third Profile",
             nick="third_user",
@@ -33,47 +38,62 @@ class NotificationsViewTest(TestCase):
         )
 
         # Create posts from profile1
-        self.post1 = Post.objects.create(
-            profile=self.profile1,
+        cls.post1 = Post.objects.create(
+            profile=cls.profile1,
             post_id="2025-01-01T12:00:00+00:00",
             content="Original post 1",
         )
-        self.post2 = Post.objects.create(
-            profile=self.profile1,
+        cls.post2 = Post.objects.create(
+            profile=cls.profile1,
             post_id="2025-01-01T13:00:00+00:00",
             content="Original post 2",
         )
 
         # Create a mention
-        self.mention_post = Post.objects.create(
-            profile=self.profile2,
+        cls.mention_post = Post.objects.create(
+            profile=cls.profile2,
             post_id="2025-01-01T14:00:00+00:00",
             content="This post mentions @example_user",
         )
         Mention.objects.create(
-            post=self.mention_post,
-            mentioned_profile=self.profile1,
+            post=cls.mention_post,
+            mentioned_profile=cls.profile1,
             nickname="example_user",
         )
 
         # Create a reaction
-        self.reaction_post = Post.objects.create(
-            profile=self.profile2,
+        cls.reaction_post = Post.objects.create(
+            profile=cls.profile2,
             post_id="2025-01-01T15:00:00+00:00",
             content="",
             mood="👍",
-            reply_to=f"{self.profile1.feed}#{self.post1.post_id}",
+            reply_to=f"{cls.profile1.feed}#{cls.post1.post_id}",
         )
 
         # Create a reply
-        self.reply_post = Post.objects.create(
-            profile=self.profile3,
+        cls.reply_post = Post.objects.create(
+            profile=cls.profile3,
             post_id="2025-01-01T16:00:00+00:00",
             content="This is a reply to post 2",
             mood="",
-            reply_to=f"{self.profile1.feed}#{self.post2.post_id}",
+            reply_to=f"{cls.profile1.feed}#{cls.post2.post_id}",
         )
 
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.factory = APIRequestFactory()
+        self.view = NotificationsView.as_view()
+        self.notifications_url = "/notifications/"
+
+    def _get(self, params=None):
+        """Call the view directly, skipping URL resolution and middleware."""
+        request = self.factory.get(self.notifications_url, params or {})
+        response = self.view(request)
+        # Mirror the test client's json() helper for direct view calls
+        response.json = lambda: json.loads(response.content)
+        return response
+
     def test_get_all_notifications_success(self):
         """Test GET /notifications/?feed=<feed_url> returns all notification types."""
         # Given: A profile with mentions, reactions, and replies
@@ -84,11 +104,11 @@ class NotificationsViewTest(TestCase):
 
         # Then: We should get notifications successfully
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(response.json()["type"], "Success")
+        self.assertEqual(response.json()["errors"], [])
 
         # Then: Response should contain all notification types
-        data = response.data["data"]
+        data = response.json()["data"]
         self.assertIsInstance(data, list)
         self.assertEqual(len(data), 3)  # 1 mention + 1 reaction + 1 reply
 
@@ -97,7 +117,7 @@ class NotificationsViewTest(TestCase):
         self.assertEqual(types, {"mention", "reaction", "reply"})
 
         # Then: Meta should include by_type breakdown
-        meta = response.data["meta"]
+        meta = response.json()["meta"]
         self.assertEqual(meta["feed"], feed_url)
         self.assertEqual(meta["total"], 3)
         self.assertIn("by_type", meta)
@@ -109,60 +129,30 @@ class NotificationsViewTest(TestCase):
         self.assertIn("ETag", response)
         self.assertIn("Last-Modified", response)
 
-    def test_get_notifications_filtered_by_mention(self):
-        """Test GET /notifications/?feed=<feed_url>&type=mention returns only mentions."""
-        # Given: A profile with all notification types
+    def test_get_notifications_filtered_by_type(self):
+        """Test GET /notifications/?feed=<feed_url>&type=<type> returns only that type."""
+        # Given: A profile with one mention, one reaction and one reply
         feed_url = self.profile1.feed
 
-        # When: We request only mentions
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "mention"}
-        )
-
-        # Then: Should only return mentions
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
-        self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]["type"], "mention")
-
-        # Then: Meta should show filtered results
-        meta = response.data["meta"]
-        self.assertEqual(meta["total"], 1)
-
-    def test_get_notifications_filtered_by_reaction(self):
-        """Test GET /notifications/?feed=<feed_url>&type=reaction returns only reactions."""
-        # Given: A profile with all notification types
-        feed_url = self.profile1.feed
-
-        # When: We request only reactions
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "reaction"}
-        )
-
-        # Then: Should only return reactions
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
-        self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]["type"], "reaction")
-        self.assertIn("emoji", data[0])
-        self.assertIn("parent", data[0])
-
-    def test_get_notifications_filtered_by_reply(self):
-        """Test GET /notifications/?feed=<feed_url>&type=reply returns only replies."""
-        # Given: A profile with all notification types
-        feed_url = self.profile1.feed
-
-        # When: We request only replies
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "reply"}
-        )
-
-        # Then: Should only return replies
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
-        self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]["type"], "reply")
-        self.assertIn("parent", data[0])
+        for notification_type, count_key in (
+            ("mention", "mentions"),
+            ("reaction", "reactions"),
+            ("reply", "replies"),
+        ):
+            with self.subTest(type=notification_type):
+                # When: We request only that notification type
+                response = self._get({"feed": feed_url, "type": notification_type})
+
+                # Then: Should only return notifications of that type
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                data = response.json()["data"]
+                self.assertEqual(len(data), 1)
+                self.assertEqual(data[0]["type"], notification_type)
+
+                # Then: Meta should show filtered results
+                meta = response.json()["meta"]
+                self.assertEqual(meta["total"], 1)
+                self.assertEqual(meta["by_type"][count_key], 1)
 
     def test_get_notifications_invalid_type(self):
         """Test GET /notifications/ with invalid type parameter returns 400."""
@@ -170,14 +160,12 @@ class NotificationsViewTest(TestCase):
         feed_url = self.profile1.feed
 
         # When: We request with invalid type
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "invalid"}
-        )
+        response = self._get({"feed": feed_url, "type": "invalid"})
 
         # Then: Should return 400 error
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data["type"], "Error")
-        self.assertIn("Invalid type parameter", response.data["errors"][0])
+        self.assertEqual(response.json()["type"], "Error")
+        self.assertIn("Invalid type parameter", response.json()["errors"][0])
 
     def test_get_notifications_no_notifications(self):
         """Test GET /notifications/ returns empty array for profile with no notifications."""
@@ -185,16 +173,16 @@ class NotificationsViewTest(TestCase):
         feed_url = self.profile2.feed
 
         # When: We request notifications for the profile
-        response = self.client.get(self.notifications_url, {"feed": feed_url})
+        response = self._get({"feed": feed_url})
 
         # Then: We should get empty array
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertEqual(response.data["errors"], [])
-        self.assertEqual(response.data["data"], [])
+        self.assertEqual(response.json()["type"], "Success")
+        self.assertEqual(response.json()["errors"], [])
+        self.assertEqual(response.json()["data"], [])
 
         # Then: Meta should show zero counts
-        meta = response.data["meta"]
+        meta = response.json()["meta"]
         self.assertEqual(meta["feed"], feed_url)
         self.assertEqual(meta["total"], 0)
         self.assertEqual(meta["by_type"]["mentions"], 0)
@@ -207,25 +195,25 @@ class NotificationsViewTest(TestCase):
         nonexistent_feed = "https://nonexistent.com/social.org"
 
         # When: We request notifications for nonexistent profile
-        response = self.client.get(self.notifications_url, {"feed": nonexistent_feed})
+        response = self._get({"feed": nonexistent_feed})
 
         # Then: We should get 404 error
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertEqual(response.data["type"], "Error")
-        self.assertIn("Profile not found", response.data["errors"][0])
-        self.assertIsNone(response.data["data"])
+        self.assertEqual(response.json()["type"], "Error")
+        self.assertIn("Profile not found", response.json()["errors"][0])
+        self.assertIsNone(response.json()["data"])
 
     def test_notifications_missing_parameters(self):
         """Test that missing required parameters return 400 error."""
         # Given: Notifications endpoint
 
         # When: We request without required parameters
-        response = self.client.get(self.notifications_url)
+        response = self._get()
 
         # Then: Should return 400 error
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data["type"], "Error")
-        self.assertIn("required", response.data["errors"][0])
+        self.assertEqual(response.json()["type"], "Error")
+        self.assertIn("required", response.json()["errors"][0])
 
     def test_notifications_response_format_compliance(self):
         """Test notifications response format compliance with README specification."""
@@ -233,22 +221,22 @@ class NotificationsViewTest(TestCase):
         feed_url = self.profile1.feed
 
         # When: We request notifications
-        response = self.client.get(self.notifications_url, {"feed": feed_url})
+        response = self._get({"feed": feed_url})
 
         # Then: Response should match expected format
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("type", response.data)
-        self.assertIn("errors", response.data)
-        self.assertIn("data", response.data)
-        self.assertIn("meta", response.data)
-        self.assertIn("_links", response.data)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertIsInstance(response.data["errors"], list)
-        self.assertIsInstance(response.data["data"], list)
-        self.assertIsInstance(response.data["meta"], dict)
+        self.assertIn("type", response.json())
+        self.assertIn("errors", response.json())
+        self.assertIn("data", response.json())
+        self.assertIn("meta", response.json())
+        self.assertIn("_links", response.json())
+        self.assertEqual(response.json()["type"], "Success")
+        self.assertIsInstance(response.json()["errors"], list)
+        self.assertIsInstance(response.json()["data"], list)
+        self.assertIsInstance(response.json()["meta"], dict)
 
         # Then: Each notification should have type field
-        for notification in response.data["data"]:
+        for notification in response.json()["data"]:
             self.assertIn("type", notification)
             self.assertIn("post", notification)
 
@@ -277,11 +265,11 @@ class NotificationsViewTest(TestCase):
         # (already set up in setUp with ascending timestamps)
 
         # When: We request all notifications
-        response = self.client.get(self.notifications_url, {"feed": self.profile1.feed})
+        response = self._get({"feed": self.profile1.feed})
 
         # Then: Should be sorted by post_id descending (most recent first)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
+        data = response.json()["data"]
 
         # Extract post_ids from the notification posts
         post_ids = []
@@ -293,59 +281,25 @@ class NotificationsViewTest(TestCase):
         # Then: post_ids should be in descending order
         self.assertEqual(post_ids, sorted(post_ids, reverse=True))
 
-    def test_notifications_mention_structure(self):
-        """Test that mention notifications have correct structure."""
-        # Given: A profile with a mention
-        feed_url = self.profile1.feed
-
-        # When: We request mention notifications
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "mention"}
-        )
-
-        # Then: Mention should have type and post fields only
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        mention = response.data["data"][0]
-        self.assertEqual(mention["type"], "mention")
-        self.assertIn("post", mention)
-        self.assertNotIn("emoji", mention)
-        self.assertNotIn("parent", mention)
-
-    def test_notifications_reaction_structure(self):
-        """Test that reaction notifications have correct structure."""
-        # Given: A profile with a reaction
-        feed_url = self.profile1.feed
-
-        # When: We request reaction notifications
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "reaction"}
-        )
-
-        # Then: Reaction should have type, post, emoji, and parent fields
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        reaction = response.data["data"][0]
-        self.assertEqual(reaction["type"], "reaction")
-        self.assertIn("post", reaction)
-        self.assertIn("emoji", reaction)
-        self.assertIn("parent", reaction)
-
-    def test_notifications_reply_structure(self):
-        """Test that reply notifications have correct structure."""
-        # Given: A profile with a reply
+    def test_notifications_structure_by_type(self):
+        """Test that each notification type has exactly its documented fields."""
+        # Given: A profile with one mention, one reaction and one reply
         feed_url = self.profile1.feed
 
-        # When: We request reply notifications
-        response = self.client.get(
-            self.notifications_url, {"feed": feed_url, "type": "reply"}
-        )
-
-        # Then: Reply should have type, post, and parent fields
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        reply = response.data["data"][0]
-        self.assertEqual(reply["type"], "reply")
-        self.assertIn("post", reply)
-        self.assertIn("parent", reply)
-        self.assertNotIn("emoji", reply)
+        for notification_type, expected_fields in (
+            ("mention", {"type", "post"}),
+            ("reaction", {"type", "post", "emoji", "parent"}),
+            ("reply", {"type", "post", "parent"}),
+        ):
+            with self.subTest(type=notification_type):
+                # When: We request notifications of that type
+                response = self._get({"feed": feed_url, "type": notification_type})
+
+                # Then: The notification should have only the expected fields
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                notification = response.json()["data"][0]
+                self.assertEqual(notification["type"], notification_type)
+                self.assertEqual(set(notification), expected_fields)
 
     def test_get_notifications_with_boosts(self):
         """Test GET /notifications/?feed=<feed_url> includes boosts."""
@@ -358,11 +312,11 @@ class NotificationsViewTest(TestCase):
         )
 
         # When: We request all notifications for the profile
-        response = self.client.get(self.notifications_url, {"feed": self.profile1.feed})
+        response = self._get({"feed": self.profile1.feed})
 
         # Then: We should get notifications including the boost
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
+        data = response.json()["data"]
 
         # Find the boost notification
         boost_notifications = [n for n in data if n["type"] == "boost"]
@@ -378,7 +332,7 @@ class NotificationsViewTest(TestCase):
         )
 
         # Then: Meta should include boost count
-        meta = response.data["meta"]
+        meta = response.json()["meta"]
         self.assertEqual(meta["by_type"]["boosts"], 1)
         self.assertEqual(meta["total"], 4)  # 1 mention + 1 reaction + 1 reply + 1 boost
 
@@ -399,13 +353,11 @@ class NotificationsViewTest(TestCase):
         )
 
         # When: We request only boosts
-        response = self.client.get(
-            self.notifications_url, {"feed": self.profile1.feed, "type": "boost"}
-        )
+        response = self._get({"feed": self.profile1.feed, "type": "boost"})
 
         # Then: Should only return boosts
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
+        data = response.json()["data"]
         self.assertEqual(len(data), 2)
 
         for boost in data:
@@ -416,6 +368,149 @@ class NotificationsViewTest(TestCase):
             self.assertNotIn("parent", boost)
 
         # Then: Meta should show filtered results
-        meta = response.data["meta"]
+        meta = response.json()["meta"]
         self.assertEqual(meta["total"], 2)
         self.assertEqual(meta["by_type"]["boosts"], 2)
+
+    def test_notifications_exclude_poll_votes_from_replies(self):
+        """Test poll votes replying to a post are not listed as replies."""
+        # Given: A vote on a poll from profile1, which is also a reply to it
+        vote_post = Post.objects.create(
+            profile=self.profile3,
+            post_id="2025-01-01T17:00:00+00:00",
+            content="",
+            reply_to=f"{self.profile1.feed}#{self.post2.post_id}",
+        )
+        PollVote.objects.create(
+            post=vote_post, poll_post=self.post2, poll_option="Option A"
+        )
+
+        # When: We request only replies
+        response = self._get({"feed": self.profile1.feed, "type": "reply"})
+
+        # Then: Only the regular reply is returned
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()["data"]
+        self.assertEqual(len(data), 1)
+        self.assertEqual(
+            data[0]["post"], f"{self.profile3.feed}#{self.reply_post.post_id}"
+        )
+
+    def test_notifications_conditional_get_returns_not_modified(self):
+        """Test a matching If-None-Match short-circuits with 304 Not Modified."""
+        # Given: A first request that populates the cache and returns an ETag
+        params = {"feed": self.profile1.feed}
+        first = self.client.get(self.notifications_url, params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        # When: The client polls again sending the same ETag
+        with self.assertNumQueries(0):
+            second = self.client.get(
+                self.notifications_url, params, HTTP_IF_NONE_MATCH=etag
+            )
+
+        # Then: Nothing changed, so no body is sent
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second["ETag"], etag)
+
+    def test_notifications_etag_differs_per_content(self):
+        """Test a stale If-None-Match gets the full body and a different ETag."""
+        # Given: Cached notifications for two different filters
+        all_response = self.client.get(
+            self.notifications_url, {"feed": self.profile1.feed}
+        )
+        mention_params = {"feed": self.profile1.feed, "type": "mention"}
+        self.client.get(self.notifications_url, mention_params)
+
+        # When: We send the ETag of the unfiltered response to the filtered one
+        response = self.client.get(
+            self.notifications_url,
+            mention_params,
+            HTTP_IF_NONE_MATCH=all_response["ETag"],
+        )
+
+        # Then: The full body is returned with its own ETag
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertNotEqual(response["ETag"], all_response["ETag"])
+
+    def test_notifications_rebuild_lock_held_by_another_request(self):
+        """Test a request that loses the rebuild lock still answers after waiting."""
+        # Given: Another request is already rebuilding the cache for this feed
+        lock_key = f"notifications:{self.profile1.feed}:all:lock"
+        cache.add(lock_key, "1", 5)
+
+        # When: We request notifications and the cache never gets filled
+        with patch("app.notifications.views.time.sleep") as sleep:
+            response = self._get({"feed": self.profile1.feed})
+
+        # Then: It waited for the other request, then built the response itself
+        self.assertEqual(sleep.call_count, 3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["meta"]["total"], 3)
+
+        # Then: The lock belongs to the other request and is left untouched
+        self.assertEqual(cache.get(lock_key), "1")
+
+    def test_notifications_unfiltered_reuses_cached_types(self):
+        """Test the unfiltered response is assembled from per-type cache entries."""
+        # Given: Every notification type was already requested on its own
+        for notification_type in ["mention", "reaction", "reply", "boost"]:
+            self._get({"feed": self.profile1.feed, "type": notification_type})
+
+        # When: We request all notifications
+        with self.assertNumQueries(0):
+            response = self._get({"feed": self.profile1.feed})
+
+        # Then: The merged response is served without touching the database
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        meta = response.json()["meta"]
+        self.assertEqual(meta["total"], 3)
+        self.assertEqual(meta["by_type"]["mentions"], 1)
+        self.assertEqual(meta["by_type"]["reactions"], 1)
+        self.assertEqual(meta["by_type"]["replies"], 1)
+
+    def test_notifications_read_cached_parts_once_per_request(self):
+        """Test the ETag check and the view share a single cache read."""
+        # Given: Nothing is cached yet for the feed
+        params = {"feed": self.profile1.feed}
+
+        # When: We request notifications, building the cache
+        with patch(
+            "app.notifications.views._get_parts",
+            wraps=notifications_views._get_parts,
+        ) as get_parts:
+            response = self._get(params)
+
+        # Then: The cached parts were read once and reused by the view
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_parts.call_count, 1)
+
+    def test_notifications_render_lone_surrogates(self):
+        """Test feed content with a lone surrogate is rendered, not a 500."""
+        # Given: A cached reaction whose emoji is a lone surrogate, which the
+        # database refuses but parsed feed content can carry
+        reaction = {
+            "type": "reaction",
+            "post": f"{self.profile2.feed}#{self.reaction_post.post_id}",
+            "emoji": "\ud83d",
+            "parent": self.reaction_post.reply_to,
+        }
+        entries = [(self.reaction_post.post_id, reaction)]
+        cache.set(
+            f"notifications:{self.profile1.feed}:reaction",
+            (entries, notifications_views._compute_etag(entries)),
+        )
+
+        # When: We request the reactions of the feed
+        response = self._get({"feed": self.profile1.feed, "type": "reaction"})
+
+        # Then: The surrogate is passed through as UTF-8 JSON
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json; charset=utf-8")
+        self.assertIn(
+            '"emoji":"\ud83d"'.encode("utf-8", errors="surrogatepass"),
+            response.content,
+        )
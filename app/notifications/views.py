@@ -1,195 +1,340 @@
 from rest_framework.views import APIView
-from rest_framework.response import Response
 from rest_framework import status
 from django.core.cache import cache
-from django.db.models import Q
+from django.http import HttpResponse
+from django.db.models import Exists, OuterRef, Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+import hashlib
+import heapq
+import json
 import logging
+import time
+from functools import lru_cache
+from operator import itemgetter
+from urllib.parse import quote
 
-from app.feeds.models import Profile, Post, Mention
+from app.feeds.models import Profile, Post, Mention, PollVote
+from app.reactions.renderers import UTF8JSONRenderer
 
 logger = logging.getLogger(__name__)
 
+# Seconds a rebuild lock is held at most, and how a waiting request polls
+REBUILD_LOCK_TIMEOUT = 5
+REBUILD_WAIT_INTERVAL = 0.05
+REBUILD_WAIT_ATTEMPTS = 3
+
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    """Render straight to UTF-8 JSON, skipping DRF renderer negotiation"""
+    return HttpResponse(
+        UTF8JSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json; charset=utf-8",
+    )
+
+
+# Notification types, each cached under its own key
+NOTIFICATION_TYPES = ("mention", "reaction", "reply", "boost")
+
+
+def _part_key(feed_url, notification_type):
+    return f"notifications:{feed_url}:{notification_type}"
+
+
+def _compute_etag(*parts):
+    """Weak ETag derived from the serialized parts"""
+    blob = json.dumps(parts, sort_keys=True).encode("utf-8")
+    return f'W/"{hashlib.blake2b(blob, digest_size=16).hexdigest()}"'
+
+
+@lru_cache(maxsize=1024)
+def _build_links(feed_url):
+    """HATEOAS links for a feed. Shared between responses, do not mutate."""
+    encoded_feed_url = quote(feed_url, safe="")
+    return {
+        "self": {
+            "href": f"/notifications/?feed={encoded_feed_url}",
+            "method": "GET",
+        },
+        "mentions": {
+            "href": f"/mentions/?feed={encoded_feed_url}",
+            "method": "GET",
+        },
+        "reactions": {
+            "href": f"/reactions/?feed={encoded_feed_url}",
+            "method": "GET",
+        },
+        "replies-to": {
+            "href": f"/replies-to/?feed={encoded_feed_url}",
+            "method": "GET",
+        },
+    }
+
+
+def _requested_types(notification_type):
+    return (notification_type,) if notification_type else NOTIFICATION_TYPES
+
+
+def _get_parts(feed_url, types):
+    """Fetch the cached (entries, etag) part of each type in one round trip"""
+    cached = cache.get_many([_part_key(feed_url, t) for t in types])
+    return {
+        t: cached[_part_key(feed_url, t)]
+        for t in types
+        if _part_key(feed_url, t) in cached
+    }
+
+
+def _wait_for_parts(feed_url, types):
+    """Poll the cache while another request rebuilds it, {} if it never fills up"""
+    for _ in range(REBUILD_WAIT_ATTEMPTS):
+        time.sleep(REBUILD_WAIT_INTERVAL)
+        parts = _get_parts(feed_url, types)
+        if len(parts) == len(types):
+            return parts
+    return {}
+
+
+def _response_etag(feed_url, notification_type, parts):
+    """Combine the part ETags, the feed and the filter into the response ETag"""
+    return _compute_etag(
+        feed_url, notification_type, [parts[t][1] for t in sorted(parts)]
+    )
+
+
+def _cached_etag(request):
+    """Build the ETag from the cached parts (no DB access)"""
+    feed_url = (request.GET.get("feed") or "").strip()
+    if not feed_url:
+        return None
+
+    notification_type = request.GET.get("type", "").strip().lower()
+    if notification_type and notification_type not in NOTIFICATION_TYPES:
+        return None
+
+    types = _requested_types(notification_type)
+    parts = _get_parts(feed_url, types)
+    # Keep what was fetched so the view does not read the cache again
+    request.notification_parts = parts
+    if len(parts) != len(types):
+        return None
+    return _response_etag(feed_url, notification_type, parts)
+
 
 class NotificationsView(APIView):
     """Get all notifications (mentions, reactions, and replies) for a specific feed URL"""
 
+    # Public, read-only endpoint: skip DRF auth, permission and throttle checks
+    authentication_classes = ()
+    permission_classes = ()
+    throttle_classes = ()
+    renderer_classes = (UTF8JSONRenderer,)
+
+    @method_decorator(condition(etag_func=_cached_etag))
     def get(self, request):
         feed_url = request.query_params.get("feed")
         notification_type = request.query_params.get("type", "").strip().lower()
 
         if not feed_url or not feed_url.strip():
-            return Response(
+            return _json_response(
                 {
                     "type": "Error",
                     "errors": ["Feed URL parameter is required"],
                     "data": None,
                 },
-                status=status.HTTP_400_BAD_REQUEST,
+                status.HTTP_400_BAD_REQUEST,
             )
 
         feed_url = feed_url.strip()
 
         # Validate type parameter if provided
-        valid_types = ["mention", "reaction", "reply", "boost"]
-        if notification_type and notification_type not in valid_types:
-            return Response(
+        if notification_type and notification_type not in NOTIFICATION_TYPES:
+            return _json_response(
                 {
                     "type": "Error",
                     "errors": [
-                        f"Invalid type parameter. Must be one of: {', '.join(valid_types)}"
+                        f"Invalid type parameter. Must be one of: {', '.join(NOTIFICATION_TYPES)}"
                     ],
                     "data": None,
                 },
-                status=status.HTTP_400_BAD_REQUEST,
+                status.HTTP_400_BAD_REQUEST,
             )
 
-        # Try to get notifications from cache first
-        cache_key = f"notifications_{feed_url}_{notification_type}"
-        cached_response = cache.get(cache_key)
+        # Try to get every requested type from cache first, reusing the parts
+        # already read to build the ETag
+        types = _requested_types(notification_type)
+        parts = getattr(request, "notification_parts", None)
+        if parts is None:
+            parts = _get_parts(feed_url, types)
 
-        if cached_response is not None:
-            return Response(cached_response, status=status.HTTP_200_OK)
+        # Single-flight rebuild: the first request to miss takes the lock and
+        # concurrent ones briefly wait for it to fill the cache
+        lock_key = f"{_part_key(feed_url, notification_type or 'all')}:lock"
+        has_lock = False
+        if len(parts) != len(types):
+            has_lock = cache.add(lock_key, "1", REBUILD_LOCK_TIMEOUT)
+            if not has_lock:
+                parts = _wait_for_parts(feed_url, types) or parts
 
-        # Check if the profile exists
         try:
-            profile = Profile.objects.get(feed=feed_url)
-        except Profile.DoesNotExist:
-            return Response(
-                {
-                    "type": "Error",
-                    "errors": ["Profile not found for the given feed URL"],
-                    "data": None,
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            missing = [t for t in types if t not in parts]
+            if missing:
+                # Only compute the types that are not cached yet
+                built = self._build_parts(feed_url, missing)
+                if built is None:
+                    return _json_response(
+                        {
+                            "type": "Error",
+                            "errors": ["Profile not found for the given feed URL"],
+                            "data": None,
+                        },
+                        status.HTTP_404_NOT_FOUND,
+                    )
+                # Cache permanently (will be cleared by scan_feeds task)
+                cache.set_many(
+                    {_part_key(feed_url, t): part for t, part in built.items()},
+                    None,
+                )
+                parts.update(built)
+        finally:
+            if has_lock:
+                cache.delete(lock_key)
 
-        notifications_data = []
+        response = _json_response(self._assemble(feed_url, parts))
+        response["ETag"] = _response_etag(feed_url, notification_type, parts)
+        return response
+
+    def _assemble(self, feed_url, parts):
+        """Merge the cached parts into the response body"""
         counts = {"mentions": 0, "reactions": 0, "replies": 0, "boosts": 0}
+        for notification_type, count_key in (
+            ("mention", "mentions"),
+            ("reaction", "reactions"),
+            ("reply", "replies"),
+            ("boost", "boosts"),
+        ):
+            if notification_type in parts:
+                counts[count_key] = len(parts[notification_type][0])
+
+        # Every part is already sorted by post_id (most recent first), so a
+        # k-way merge gives the global order without re-sorting
+        notifications_data = [
+            notification
+            for _, notification in heapq.merge(
+                *(parts[t][0] for t in NOTIFICATION_TYPES if t in parts),
+                key=itemgetter(0),
+                reverse=True,
+            )
+        ]
 
-        # Get all post IDs from this profile (for reactions and replies)
+        return {
+            "type": "Success",
+            "errors": [],
+            "data": notifications_data,
+            "meta": {
+                "feed": feed_url,
+                "total": len(notifications_data),
+                "by_type": counts,
+            },
+            "_links": _build_links(feed_url),
+        }
+
+    def _build_parts(self, feed_url, types):
+        """Query the given notification types, None if the profile does not exist
+
+        Each part is a list of (post_id, notification) pairs ordered by post_id
+        (most recent first) together with its ETag.
+        """
+        # Check if the profile exists (only the PK is needed downstream)
+        profile = Profile.objects.filter(feed=feed_url).only("id").first()
+        if profile is None:
+            return None
+
+        # Get all post IDs from this profile (for reactions, replies and boosts)
         profile_post_ids = list(profile.posts.values_list("post_id", flat=True))
-        reply_to_patterns = [f"{feed_url}#{post_id}" for post_id in profile_post_ids]
+        # Replies and reactions point to feed#post_id, and so do boosts
+        post_patterns = [f"{feed_url}#{post_id}" for post_id in profile_post_ids]
 
-        # 1. Get mentions (if not filtering or filtering for mentions)
-        if not notification_type or notification_type == "mention":
+        entries = {}
+
+        # 1. Get mentions
+        if "mention" in types:
             mentions = (
                 Mention.objects.filter(mentioned_profile=profile)
                 .select_related("post", "post__profile")
                 .order_by("-post__post_id")
             )
-            for mention in mentions:
-                notifications_data.append(
+            entries["mention"] = [
+                (
+                    mention.post.post_id,
                     {
                         "type": "mention",
                         "post": f"{mention.post.profile.feed}#{mention.post.post_id}",
-                        "_sort_key": mention.post.post_id,  # For sorting
-                    }
+                    },
                 )
-            counts["mentions"] = len(mentions)
+                for mention in mentions
+            ]
 
-        # 2. Get reactions (if not filtering or filtering for reactions)
-        if not notification_type or notification_type == "reaction":
+        # 2. Get reactions
+        if "reaction" in types:
             reactions = (
-                Post.objects.filter(reply_to__in=reply_to_patterns, mood__isnull=False)
+                Post.objects.filter(reply_to__in=post_patterns, mood__isnull=False)
                 .exclude(mood="")
                 .select_related("profile")
                 .order_by("-post_id")
             )
-            for reaction in reactions:
-                notifications_data.append(
+            entries["reaction"] = [
+                (
+                    reaction.post_id,
                     {
                         "type": "reaction",
                         "post": f"{reaction.profile.feed}#{reaction.post_id}",
                         "emoji": reaction.mood,
                         "parent": reaction.reply_to,
-                        "_sort_key": reaction.post_id,
-                    }
+                    },
                 )
-            counts["reactions"] = len(reactions)
+                for reaction in reactions
+            ]
 
-        # 3. Get replies (if not filtering or filtering for replies)
-        if not notification_type or notification_type == "reply":
+        # 3. Get replies
+        if "reply" in types:
             replies = (
-                Post.objects.filter(reply_to__in=reply_to_patterns)
+                Post.objects.filter(reply_to__in=post_patterns)
                 .filter(Q(mood="") | Q(mood__isnull=True))
-                .exclude(poll_votes__isnull=False)
+                .filter(~Exists(PollVote.objects.filter(post=OuterRef("pk"))))
                 .select_related("profile")
                 .order_by("-post_id")
             )
-            for reply in replies:
-                notifications_data.append(
+            entries["reply"] = [
+                (
+                    reply.post_id,
                     {
                         "type": "reply",
                         "post": f"{reply.profile.feed}#{reply.post_id}",
                         "parent": reply.reply_to,
-                        "_sort_key": reply.post_id,
-                    }
+                    },
                 )
-            counts["replies"] = len(replies)
-
-        # 4. Get boosts (if not filtering or filtering for boosts)
-        # Build include patterns (feed#post_id) for all posts from this profile
-        include_patterns = [f"{feed_url}#{post_id}" for post_id in profile_post_ids]
+                for reply in replies
+            ]
 
-        if not notification_type or notification_type == "boost":
+        # 4. Get boosts
+        if "boost" in types:
             boosts = (
-                Post.objects.filter(include__in=include_patterns)
+                Post.objects.filter(include__in=post_patterns)
                 .select_related("profile")
                 .order_by("-post_id")
             )
-            for boost in boosts:
-                notifications_data.append(
+            entries["boost"] = [
+                (
+                    boost.post_id,
                     {
                         "type": "boost",
                         "post": f"{boost.profile.feed}#{boost.post_id}",
                         "boosted": boost.include,
-                        "_sort_key": boost.post_id,
-                    }
+                    },
                 )
-            counts["boosts"] = len(boosts)
-
-        # Sort all notifications by post_id (most recent first)
-        notifications_data.sort(key=lambda x: x["_sort_key"], reverse=True)
-
-        # Remove the _sort_key field from the final output
-        for notification in notifications_data:
-            del notification["_sort_key"]
-
-        # URL encode the feed_url for links
-        from urllib.parse import quote
-
-        encoded_feed_url = quote(feed_url, safe="")
-
-        response_data = {
-            "type": "Success",
-            "errors": [],
-            "data": notifications_data,
-            "meta": {
-                "feed": feed_url,
-                "total": len(notifications_data),
-                "by_type": counts,
-            },
-            "_links": {
-                "self": {
-                    "href": f"/notifications/?feed={encoded_feed_url}",
-                    "method": "GET",
-                },
-                "mentions": {
-                    "href": f"/mentions/?feed={encoded_feed_url}",
-                    "method": "GET",
-                },
-                "reactions": {
-                    "href": f"/reactions/?feed={encoded_feed_url}",
-                    "method": "GET",
-                },
-                "replies-to": {
-                    "href": f"/replies-to/?feed={encoded_feed_url}",
-                    "method": "GET",
-                },
-            },
-        }
-
-        # Cache permanently (will be cleared by scan_feeds task)
-        cache.set(cache_key, response_data, None)
+                for boost in boosts
+            ]
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        return {t: (part, _compute_etag(part)) for t, part in entries.items()}
@@ -2,17 +2,127 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Prefetch
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from itertools import chain, groupby, islice
+from operator import itemgetter
+import hashlib
 import logging
 
-from app.feeds.models import Post, Profile, PollVote
+from app.feeds.models import Post, Profile, PollOption, PollVote
+from app.reactions.renderers import UTF8JSONRenderer
 
 logger = logging.getLogger(__name__)
 
+# Polls rendered per chunk when streaming the full list
+STREAM_CHUNK_SIZE = 2000
+
+
+def _cache_key(prefix, url):
+    """Fixed length cache key for a URL, safe for any cache backend"""
+    return f"{prefix}_{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}"
+
+
+def _poll_options_prefetch():
+    """Poll options with only the columns the views read, in poll order.
+
+    The post FK stays selected so the options can be attached to their poll.
+    """
+    return Prefetch(
+        "poll_options", queryset=PollOption.objects.only("post", "option_text")
+    )
+
+
+def _json_bytes_response(content, etag):
+    """Successful response from already rendered JSON bytes"""
+    response = HttpResponse(content, content_type="application/json; charset=utf-8")
+    response["ETag"] = etag
+    return response
+
+
+def _cache_content(cache_key, content):
+    """Cache rendered JSON bytes along with their ETag, return the ETag"""
+    etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+    # Cache permanently (will be cleared by scan_feeds task)
+    cache.set(cache_key, (content, etag), None)
+    return etag
+
+
+def _cache_response(cache_key, content):
+    """Cache rendered JSON bytes and respond with them"""
+    return _json_bytes_response(content, _cache_content(cache_key, content))
+
+
+def _page_params(query_params):
+    """(page, perPage) of a paginated request, None if they are invalid"""
+    try:
+        page = int(query_params["page"])
+        per_page = min(int(query_params.get("perPage", 10)), 50)
+    except ValueError:
+        return None
+    if page < 1 or per_page < 1:
+        return None
+    return page, per_page
+
+
+def _polls_cache_key(query_params):
+    """Cache key of a /polls/ response, None if it is never cached"""
+    voter_url = query_params.get("voter")
+    feed_url = query_params.get("feed")
+    if voter_url:
+        return _cache_key("voter_polls", voter_url.strip())
+    if feed_url:
+        return _cache_key("feed_polls", feed_url.strip())
+    if "page" not in query_params:
+        return "all_polls"
+    page_params = _page_params(query_params)
+    if page_params is None:
+        return None
+    return "all_polls_{}_{}".format(*page_params)
+
+
+def _poll_votes_cache_key(query_params):
+    """Cache key of a /polls/votes/ response, None if it is never cached"""
+    post_url = query_params.get("post")
+    if not post_url or "#" not in post_url:
+        return None
+    return _cache_key("poll_votes", post_url)
+
+
+def _cached_etag(request, cache_key):
+    """ETag of a cached response (no DB access), None when not cached"""
+    if cache_key is None:
+        return None
+    cached = cache.get(cache_key)
+    # Keep what was read so the view does not read the cache again
+    request.cached_polls_response = (cache_key, cached)
+    return cached[1] if cached is not None else None
+
+
+def _get_cached(request, cache_key):
+    """Cached (content, etag) of a response, reusing the ETag check's read"""
+    read_key, cached = getattr(request, "cached_polls_response", (None, None))
+    if read_key == cache_key:
+        return cached
+    return cache.get(cache_key)
+
 
 class PollsView(APIView):
     """List polls or get polls for a specific feed"""
 
+    http_method_names = ["get", "head", "options"]
+
+    @method_decorator(
+        condition(
+            etag_func=lambda request: _cached_etag(
+                request, _polls_cache_key(request.GET)
+            )
+        )
+    )
     def get(self, request):
         feed_url = request.query_params.get("feed")
         voter_url = request.query_params.get("voter")
@@ -21,43 +131,153 @@ class PollsView(APIView):
             return self._get_voter_polls(voter_url)
         elif feed_url:
             return self._get_feed_polls(feed_url)
-        else:
+
+        # Pagination is opt-in: without "page" every poll is returned
+        if "page" not in request.query_params:
             return self._get_all_polls()
 
+        page_params = _page_params(request.query_params)
+        if page_params is None:
+            return Response(
+                {
+                    "type": "Error",
+                    "errors": ["'page' and 'perPage' must be positive integers"],
+                    "data": None,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self._get_all_polls_page(*page_params)
+
+    def _all_polls_query(self):
+        """All polls (active and expired), only the columns of the URL"""
+        return (
+            Post.objects.filter(poll_end__isnull=False)
+            .order_by("-created_at")
+            .values_list("profile__feed", "post_id")
+        )
+
     def _get_all_polls(self):
         """Get all polls in the system (active and expired)"""
         cache_key = "all_polls"
-        cached_polls = cache.get(cache_key)
+        cached_response = _get_cached(self.request, cache_key)
 
-        if cached_polls is not None:
-            return Response(
-                {"type": "Success", "errors": [], "data": cached_polls},
-                status=status.HTTP_200_OK,
+        if cached_response is not None:
+            return _json_bytes_response(*cached_response)
+
+        rows = self._all_polls_query().iterator(chunk_size=STREAM_CHUNK_SIZE)
+        batches = iter(lambda: list(islice(rows, STREAM_CHUNK_SIZE)), [])
+        first_batch = next(batches, [])
+
+        # Polls that fit in one chunk are rendered in memory and served with
+        # their content ETag, like a cached response
+        if len(first_batch) < STREAM_CHUNK_SIZE:
+            return _cache_response(
+                cache_key, b"".join(self._render_all_polls([first_batch]))
             )
 
-        # Get all polls (both active and expired)
-        polls = (
-            Post.objects.filter(poll_end__isnull=False)
-            .select_related("profile")
-            .prefetch_related("poll_options")
-            .order_by("-created_at")
+        # Otherwise rows go from the cursor straight into the response, so a
+        # large relay neither keeps every poll in memory nor waits for the last
+        # row. The status line is sent before the body: a database error half
+        # way leaves the client with a truncated body and nothing is cached.
+        # No ETag is sent as the body is not known yet; once cached, the next
+        # response carries its content ETag.
+        return StreamingHttpResponse(
+            self._stream_all_polls(cache_key, chain([first_batch], batches)),
+            content_type="application/json; charset=utf-8",
         )
 
-        polls_data = []
-        for poll in polls:
-            # According to README, should return simple URL format
-            poll_url = f"{poll.profile.feed}#{poll.post_id}"
-            polls_data.append(poll_url)
+    def _render_all_polls(self, batches):
+        """Yield the all polls response in chunks, one per batch of rows"""
+        renderer = UTF8JSONRenderer()
+        yield b'{"type":"Success","errors":[],"data":['
+
+        # According to README, should return simple URL format
+        total = 0
+        for batch in batches:
+            # Strip the brackets of the rendered list to splice it into "data"
+            chunk = renderer.render([f"{feed}#{post_id}" for feed, post_id in batch])
+            yield (b"," if total else b"") + chunk[1:-1]
+            total += len(batch)
+
+        yield b"]," + renderer.render(
+            {
+                "meta": {
+                    "total": total,
+                },
+                "_links": {
+                    "self": {"href": "/polls/", "method": "GET"},
+                    "votes": {
+                        "href": "/polls/votes/?post={post_url}",
+                        "method": "GET",
+                        "templated": True,
+                    },
+                },
+            }
+        )[1:]
+
+    def _stream_all_polls(self, cache_key, batches):
+        """Stream the all polls response, then cache the whole body"""
+        body = []
+        for chunk in self._render_all_polls(batches):
+            body.append(chunk)
+            yield chunk
+
+        # Cache the rendered bytes only once the whole body has been produced
+        _cache_content(cache_key, b"".join(body))
+
+    def _get_all_polls_page(self, page, per_page):
+        """Get one page of all polls in the system"""
+        cache_key = f"all_polls_{page}_{per_page}"
+        cached_response = _get_cached(self.request, cache_key)
+
+        if cached_response is not None:
+            return _json_bytes_response(*cached_response)
+
+        paginator = Paginator(self._all_polls_query(), per_page)
+
+        # Without polls there is still one (empty) first page
+        if page > paginator.num_pages:
+            return Response(
+                {
+                    "type": "Error",
+                    "errors": [
+                        f"Page {page} does not exist. Maximum page is {paginator.num_pages}"
+                    ],
+                    "data": None,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        polls_page = paginator.get_page(page)
+        polls_data = [f"{feed}#{post_id}" for feed, post_id in polls_page]
+
+        base_url = "/polls/?"
+        if per_page != 10:
+            base_url += f"perPage={per_page}&"
 
         response_data = {
             "type": "Success",
             "errors": [],
             "data": polls_data,
             "meta": {
-                "total": len(polls_data),
+                "total": paginator.count,
+                "page": page,
+                "perPage": per_page,
+                "hasNext": polls_page.has_next(),
+                "hasPrevious": polls_page.has_previous(),
             },
             "_links": {
-                "self": {"href": "/polls/", "method": "GET"},
+                "self": {"href": f"{base_url}page={page}", "method": "GET"},
+                "next": (
+                    {"href": f"{base_url}page={page + 1}", "method": "GET"}
+                    if polls_page.has_next()
+                    else None
+                ),
+                "previous": (
+                    {"href": f"{base_url}page={page - 1}", "method": "GET"}
+                    if polls_page.has_previous()
+                    else None
+                ),
                 "votes": {
                     "href": "/polls/votes/?post={post_url}",
                     "method": "GET",
@@ -66,24 +286,29 @@ class PollsView(APIView):
             },
         }
 
-        # Cache permanently (will be cleared by scan_feeds task)
-        cache.set(cache_key, response_data["data"], None)
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Cache the rendered bytes, so cache hits skip serialization entirely
+        return _cache_response(cache_key, UTF8JSONRenderer().render(response_data))
 
     def _get_feed_polls(self, feed_url):
         """Get polls for a specific feed"""
         feed_url = feed_url.strip()
-        cache_key = f"feed_polls_{feed_url}"
-        cached_response = cache.get(cache_key)
+        cache_key = _cache_key("feed_polls", feed_url)
+        cached_response = _get_cached(self.request, cache_key)
 
         if cached_response is not None:
-            return Response(cached_response, status=status.HTTP_200_OK)
+            return _json_bytes_response(*cached_response)
+
+        # Get all polls from this profile, joining on the feed URL so the
+        # profile itself is only looked up when there are no polls
+        polls = list(
+            Post.objects.filter(profile__feed=feed_url, poll_end__isnull=False)
+            .only("post_id", "content", "poll_end", "created_at")
+            .prefetch_related(_poll_options_prefetch())
+            .order_by("-created_at")
+        )
 
         # Check if the profile exists
-        try:
-            profile = Profile.objects.get(feed=feed_url)
-        except Profile.DoesNotExist:
+        if not polls and not Profile.objects.filter(feed=feed_url).exists():
             return Response(
                 {
                     "type": "Error",
@@ -93,20 +318,16 @@ class PollsView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get all polls from this profile
-        polls = (
-            Post.objects.filter(profile=profile, poll_end__isnull=False)
-            .prefetch_related("poll_options")
-            .order_by("-created_at")
-        )
+        # Judge every poll against the same instant
+        now = timezone.now()
 
         polls_data = []
         for poll in polls:
             # Check if poll is still active
-            is_active = timezone.now() < poll.poll_end if poll.poll_end else False
+            is_active = now < poll.poll_end if poll.poll_end else False
 
             poll_data = {
-                "id": f"{poll.profile.feed}#{poll.post_id}",
+                "id": f"{feed_url}#{poll.post_id}",
                 "post_id": poll.post_id,
                 "content": poll.content,
                 "poll_end": poll.poll_end.isoformat(),
@@ -126,24 +347,37 @@ class PollsView(APIView):
             },
         }
 
-        # Cache permanently (will be cleared by scan_feeds task)
-        cache.set(cache_key, response_data, None)
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Cache the rendered bytes, so cache hits skip serialization entirely
+        return _cache_response(cache_key, UTF8JSONRenderer().render(response_data))
 
     def _get_voter_polls(self, voter_url):
         """Get votes cast by a specific voter"""
         voter_url = voter_url.strip()
-        cache_key = f"voter_polls_{voter_url}"
-        cached_response = cache.get(cache_key)
+        cache_key = _cache_key("voter_polls", voter_url)
+        cached_response = _get_cached(self.request, cache_key)
 
         if cached_response is not None:
-            return Response(cached_response, status=status.HTTP_200_OK)
+            return _json_bytes_response(*cached_response)
+
+        # Get all votes cast by this voter, joining on the feed URL so the
+        # profile itself is only looked up when there are no votes
+        votes = list(
+            PollVote.objects.filter(post__profile__feed=voter_url)
+            .select_related("post", "poll_post", "poll_post__profile")
+            .only(
+                "poll_option",
+                "created_at",
+                "post__post_id",
+                "poll_post__post_id",
+                "poll_post__content",
+                "poll_post__profile__feed",
+                "poll_post__profile__nick",
+            )
+            .order_by("-created_at")
+        )
 
         # Check if the voter profile exists
-        try:
-            voter_profile = Profile.objects.get(feed=voter_url)
-        except Profile.DoesNotExist:
+        if not votes and not Profile.objects.filter(feed=voter_url).exists():
             return Response(
                 {
                     "type": "Error",
@@ -153,17 +387,11 @@ class PollsView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get all votes cast by this voter
-        votes = (
-            PollVote.objects.filter(post__profile=voter_profile)
-            .select_related("post", "poll_post", "poll_post__profile")
-            .order_by("-created_at")
-        )
-
         votes_data = []
         for vote in votes:
             vote_data = {
-                "vote_post_id": f"{vote.post.profile.feed}#{vote.post.post_id}",
+                # Every vote was posted by the voter, no need to join back
+                "vote_post_id": f"{voter_url}#{vote.post.post_id}",
                 "poll_id": f"{vote.poll_post.profile.feed}#{vote.poll_post.post_id}",
                 "poll_author": vote.poll_post.profile.nick,
                 "poll_content": vote.poll_post.content,
@@ -182,15 +410,22 @@ class PollsView(APIView):
             },
         }
 
-        # Cache permanently (will be cleared by scan_feeds task)
-        cache.set(cache_key, response_data, None)
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Cache the rendered bytes, so cache hits skip serialization entirely
+        return _cache_response(cache_key, UTF8JSONRenderer().render(response_data))
 
 
 class PollVotesView(APIView):
     """Get votes for a specific poll"""
 
+    http_method_names = ["get", "head", "options"]
+
+    @method_decorator(
+        condition(
+            etag_func=lambda request: _cached_etag(
+                request, _poll_votes_cache_key(request.GET)
+            )
+        )
+    )
     def get(self, request):
         post_url = request.query_params.get("post")
 
@@ -219,17 +454,30 @@ class PollVotesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cache_key = f"poll_votes_{poll_feed}_{poll_id}"
-        cached_response = cache.get(cache_key)
+        cache_key = _poll_votes_cache_key(request.query_params)
+        cached_response = _get_cached(request, cache_key)
 
         if cached_response is not None:
-            return Response(cached_response, status=status.HTTP_200_OK)
-
-        # Find the poll post
-        try:
-            poll_profile = Profile.objects.get(feed=poll_feed)
-            poll_post = Post.objects.get(profile=poll_profile, post_id=poll_id)
-        except (Profile.DoesNotExist, Post.DoesNotExist):
+            return _json_bytes_response(*cached_response)
+
+        # Find the poll (joined on the feed URL) along with its options
+        post_lookup = Post.objects.filter(profile__feed=poll_feed, post_id=poll_id)
+        poll_post = (
+            post_lookup.filter(poll_end__isnull=False)
+            .prefetch_related(_poll_options_prefetch())
+            .first()
+        )
+        if poll_post is None:
+            # Only now tell a post that is not a poll from a missing one
+            if post_lookup.exists():
+                return Response(
+                    {
+                        "type": "Error",
+                        "errors": ["Post is not a poll"],
+                        "data": None,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
             return Response(
                 {
                     "type": "Error",
@@ -239,34 +487,19 @@ class PollVotesView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Verify it's actually a poll
-        if not poll_post.is_poll:
-            return Response(
-                {
-                    "type": "Error",
-                    "errors": ["Post is not a poll"],
-                    "data": None,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Get all votes for this poll
+        # Get all votes for this poll as bare URL columns, sorted by option
+        # so they can be grouped in one pass (newest first within an option)
         votes = (
             PollVote.objects.filter(poll_post=poll_post)
-            .select_related("post", "post__profile")
-            .order_by("-created_at")
+            .order_by("poll_option", "-created_at")
+            .values_list("poll_option", "post__profile__feed", "post__post_id")
         )
 
         # Group votes by option according to README format
-        vote_options = {}
-
-        for vote in votes:
-            option = vote.poll_option
-            vote_post_url = f"{vote.post.profile.feed}#{vote.post.post_id}"
-
-            if option not in vote_options:
-                vote_options[option] = []
-            vote_options[option].append(vote_post_url)
+        vote_options = {
+            option: [f"{feed}#{post_id}" for _, feed, post_id in option_votes]
+            for option, option_votes in groupby(votes, key=itemgetter(0))
+        }
 
         # Get poll options for complete results
         poll_options = [opt.option_text for opt in poll_post.poll_options.all()]
@@ -301,7 +534,5 @@ class PollVotesView(APIView):
             },
         }
 
-        # Cache permanently (will be cleared by scan_feeds task)
-        cache.set(cache_key, response_data, None)
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        # Cache the rendered bytes, so cache hits skip serialization entirely
+        return _cache_response(cache_key, UTF8JSONRenderer().render(response_data))
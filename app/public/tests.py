@@ -83,6 +83,18 @@ class RootViewTest(TestCase):
         # Then: ETag should be the same (content is static)
         self.assertEqual(response1["ETag"], response2["ETag"])
 
+    def test_root_endpoint_not_modified(self):
+        """Test GET / with a matching If-None-Match returns 304."""
+        # Given: The ETag of a previous response
+        etag = self.client.get(self.root_url)["ETag"]
+
+        # When: We request the root endpoint again with that ETag
+        response = self.client.get(self.root_url, HTTP_IF_NONE_MATCH=etag)
+
+        # Then: The body is not sent again
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
     def test_root_endpoint_response_format_compliance(self):
         """Test root endpoint response format compliance."""
         # Given: The root endpoint
@@ -1,115 +1,124 @@
-from django.http import JsonResponse
+from django.http import HttpResponse
+from django.views.decorators.http import etag
+import hashlib
+import json
 
+# Root payload, static between deploys
+ROOT_PAYLOAD = {
+    "type": "Success",
+    "errors": [],
+    "data": {
+        "name": "Org Social Relay",
+        "description": "P2P system for Org Social files",
+    },
+    "_links": {
+        "self": {"href": "/", "method": "GET"},
+        "feeds": {"href": "/feeds/", "method": "GET"},
+        "add-feed": {"href": "/feeds/", "method": "POST"},
+        "feed-content": {
+            "href": "/feed-content/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "mentions": {
+            "href": "/mentions/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "replies": {
+            "href": "/replies/?post={post_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "notifications": {
+            "href": "/notifications/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "sse-notifications": {
+            "href": "/sse/notifications/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "sse-notifications-all": {
+            "href": "/sse/notifications/",
+            "method": "GET",
+        },
+        "reactions": {
+            "href": "/reactions/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "replies-to": {
+            "href": "/replies-to/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "boosts": {
+            "href": "/boosts/?post={post_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "interactions": {
+            "href": "/interactions/?post={post_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "search": {
+            "href": "/search/?q={query}",
+            "method": "GET",
+            "templated": True,
+        },
+        "groups": {"href": "/groups/", "method": "GET"},
+        "group-messages": {
+            "href": "/groups/{group_name}/",
+            "method": "GET",
+            "templated": True,
+        },
+        "join-group": {
+            "href": "/groups/{group_name}/members/?feed={feed_url}",
+            "method": "POST",
+            "templated": True,
+        },
+        "polls": {"href": "/polls/", "method": "GET"},
+        "poll-votes": {
+            "href": "/polls/votes/?post={post_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "profile": {
+            "href": "/profile/?feed={feed_url}",
+            "method": "GET",
+            "templated": True,
+        },
+        "rss": {
+            "href": "/rss.xml",
+            "method": "GET",
+            "description": "RSS feed of latest posts (supports ?tag={tag} and ?feed={feed_url} filters)",
+        },
+        "stats": {"href": "/stats/", "method": "GET"},
+        "bridge": {"href": "/bridge/", "method": "GET"},
+        "bridge-activitypub": {
+            "href": "/bridge/activitypub/@{user}@{instance}/",
+            "method": "GET",
+            "templated": True,
+            "description": "ActivityPub account as a virtual social.org feed",
+        },
+        "bridge-rss": {
+            "href": "/bridge/rss/?url={feed_url}",
+            "method": "GET",
+            "templated": True,
+            "description": "RSS/Atom feed as a virtual social.org feed",
+        },
+    },
+}
 
+# Serialized and hashed once at import time instead of on every request
+_ROOT_CONTENT = json.dumps(ROOT_PAYLOAD, separators=(",", ":")).encode("utf-8")
+_ROOT_ETAG = f'"{hashlib.blake2b(_ROOT_CONTENT, digest_size=16).hexdigest()}"'
+
+
+@etag(lambda request: _ROOT_ETAG)
 def root_view(request):
     """Root endpoint with HATEOAS links"""
-    return JsonResponse(
-        {
-            "type": "Success",
-            "errors": [],
-            "data": {
-                "name": "Org Social Relay",
-                "description": "P2P system for Org Social files",
-            },
-            "_links": {
-                "self": {"href": "/", "method": "GET"},
-                "feeds": {"href": "/feeds/", "method": "GET"},
-                "add-feed": {"href": "/feeds/", "method": "POST"},
-                "feed-content": {
-                    "href": "/feed-content/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "mentions": {
-                    "href": "/mentions/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "replies": {
-                    "href": "/replies/?post={post_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "notifications": {
-                    "href": "/notifications/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "sse-notifications": {
-                    "href": "/sse/notifications/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "sse-notifications-all": {
-                    "href": "/sse/notifications/",
-                    "method": "GET",
-                },
-                "reactions": {
-                    "href": "/reactions/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "replies-to": {
-                    "href": "/replies-to/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "boosts": {
-                    "href": "/boosts/?post={post_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "interactions": {
-                    "href": "/interactions/?post={post_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "search": {
-                    "href": "/search/?q={query}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "groups": {"href": "/groups/", "method": "GET"},
-                "group-messages": {
-                    "href": "/groups/{group_name}/",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "join-group": {
-                    "href": "/groups/{group_name}/members/?feed={feed_url}",
-                    "method": "POST",
-                    "templated": True,
-                },
-                "polls": {"href": "/polls/", "method": "GET"},
-                "poll-votes": {
-                    "href": "/polls/votes/?post={post_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "profile": {
-                    "href": "/profile/?feed={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                },
-                "rss": {
-                    "href": "/rss.xml",
-                    "method": "GET",
-                    "description": "RSS feed of latest posts (supports ?tag={tag} and ?feed={feed_url} filters)",
-                },
-                "stats": {"href": "/stats/", "method": "GET"},
-                "bridge": {"href": "/bridge/", "method": "GET"},
-                "bridge-activitypub": {
-                    "href": "/bridge/activitypub/@{user}@{instance}/",
-                    "method": "GET",
-                    "templated": True,
-                    "description": "ActivityPub account as a virtual social.org feed",
-                },
-                "bridge-rss": {
-                    "href": "/bridge/rss/?url={feed_url}",
-                    "method": "GET",
-                    "templated": True,
-                    "description": "RSS/Atom feed as a virtual social.org feed",
-                },
-            },
-        }
-    )
+    return HttpResponse(_ROOT_CONTENT, content_type="application/json")
@@ -1,5 +1,6 @@
 from rest_framework.renderers import JSONRenderer
 import json
+import orjson
 
 
 class UTF8JSONRenderer(JSONRenderer):
@@ -17,7 +18,12 @@ class UTF8JSONRenderer(JSONRenderer):
         indent = self.get_indent(accepted_media_type, renderer_context)
 
         if indent is None:
-            separators = (",", ":")
+            # orjson writes UTF-8 bytes directly. Types it does not know and
+            # invalid surrogates raise a TypeError, handled by json below.
+            try:
+                return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                separators = (",", ":")
         else:
             separators = (",", ": ")
 
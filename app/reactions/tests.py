@@ -1,64 +1,77 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from app.feeds.models import Profile, Post, PollVote
+from app.feeds.models import Profile, Post, PollVote, RelayMetadata
+from app.feeds.testing import LocMemCacheMixin
+from app.reactions.renderers import UTF8JSONRenderer
 
 
-class ReactionsViewTest(TestCase):
+class ReactionsViewTest(LocMemCacheMixin, TestCase):
     """Test cases for the ReactionsView API using Given/When/Then structure."""
 
-    def setUp(self):
-        self.client = APIClient()
-        self.reactions_url = "/reactions/"
+    client_class = APIClient
 
+    @classmethod
+    def setUpTestData(cls):
         # Create test profiles
-        self.profile1 = Profile.objects.create(
-            feed="https://example.com/social.org",
-            title="Example Profile",
-            nick="example_user",
-            description="Test profile 1",
-        )
-        self.profile2 = Profile.objects.create(
-            feed="https://test.com/social.org",
-            title="Test Profile",
-            nick="test_user",
-            description="Test profile 2",
-        )
-        self.profile3 = Profile.objects.create(
-            feed="https://third.com/social.org",
-            title="Third Profile",
-            nick="third_user",
-            description="Test profile 3",
+        cls.profile1, cls.profile2, cls.profile3 = Profile.objects.bulk_create(
+            [
+                Profile(
+                    feed="https://example.com/social.org",
+                    title="Example Profile",
+                    nick="example_user",
+                    description="Test profile 1",
+                ),
+                Profile(
+                    feed="https://test.com/social.org",
+                    title="Test Profile",
+                    nick="test_user",
+                    description="Test profile 2",
+                ),
+                Profile(
+                    feed="https://third.com/social.org",
+                    title="Third Profile",
+                    nick="third_user",
+                    description="Test profile 3",
+                ),
+            ]
         )
 
-        # Create posts from profile1
-        self.post1 = Post.objects.create(
-            profile=self.profile1,
-            post_id="2025-01-01T12:00:00+00:00",
-            content="Original post 1",
-        )
-        self.post2 = Post.objects.create(
-            profile=self.profile1,
-            post_id="2025-01-01T13:00:00+00:00",
-            content="Original post 2",
+        # Create posts from profile1, and reactions to them (posts with mood
+        # and reply_to) from the other profiles
+        cls.post1, cls.post2, cls.reaction1, cls.reaction2 = Post.objects.bulk_create(
+            [
+                Post(
+                    profile=cls.profile1,
+                    post_id="2025-01-01T12:00:00+00:00",
+                    content="Original post 1",
+                ),
+                Post(
+                    profile=cls.profile1,
+                    post_id="2025-01-01T13:00:00+00:00",
+                    content="Original post 2",
+                ),
+                Post(
+                    profile=cls.profile2,
+                    post_id="2025-01-01T14:00:00+00:00",
+                    content="",
+                    mood="👍",
+                    reply_to=f"{cls.profile1.feed}#2025-01-01T12:00:00+00:00",
+                ),
+                Post(
+                    profile=cls.profile3,
+                    post_id="2025-01-01T15:00:00+00:00",
+                    content="",
+                    mood="❤️",
+                    reply_to=f"{cls.profile1.feed}#2025-01-01T13:00:00+00:00",
+                ),
+            ]
         )
 
-        # Create reactions (posts with mood and reply_to)
-        self.reaction1 = Post.objects.create(
-            profile=self.profile2,
-            post_id="2025-01-01T14:00:00+00:00",
-            content="",
-            mood="👍",
-            reply_to=f"{self.profile1.feed}#{self.post1.post_id}",
-        )
-        self.reaction2 = Post.objects.create(
-            profile=self.profile3,
-            post_id="2025-01-01T15:00:00+00:00",
-            content="",
-            mood="❤️",
-            reply_to=f"{self.profile1.feed}#{self.post2.post_id}",
-        )
+    def setUp(self):
+        super().setUp()
+        self.reactions_url = "/reactions/"
 
     def test_get_reactions_success(self):
         """Test GET /reactions/?feed=<feed_url> returns reactions for profile's posts."""
@@ -68,39 +81,34 @@ class ReactionsViewTest(TestCase):
         # When: We request reactions for the profile
         response = self.client.get(self.reactions_url, {"feed": feed_url})
 
-        # Then: We should get reactions successfully
+        # Then: We get every reaction (newest first) with the feed metadata
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertEqual(response.data["errors"], [])
-
-        # Then: Response should contain reaction data
-        data = response.data["data"]
-        self.assertIsInstance(data, list)
-        self.assertEqual(len(data), 2)  # 2 reactions
-
-        # Then: Each reaction should have expected structure
-        for reaction in data:
-            self.assertIn("post", reaction)
-            self.assertIn("emoji", reaction)
-            self.assertIn("parent", reaction)
-            self.assertIsInstance(reaction["post"], str)
-            self.assertIsInstance(reaction["emoji"], str)
-            self.assertIsInstance(reaction["parent"], str)
-            self.assertIn("#", reaction["post"])
-            self.assertIn("#", reaction["parent"])
-
-        # Then: Should contain expected reaction data
-        reaction_posts = [r["post"] for r in data]
-        expected_url1 = f"{self.profile2.feed}#{self.reaction1.post_id}"
-        expected_url2 = f"{self.profile3.feed}#{self.reaction2.post_id}"
-
-        self.assertIn(expected_url1, reaction_posts)
-        self.assertIn(expected_url2, reaction_posts)
-
-        # Then: Meta should contain correct information
-        meta = response.data["meta"]
-        self.assertEqual(meta["feed"], feed_url)
-        self.assertEqual(meta["total"], 2)
+        self.assertEqual(
+            response.data,
+            {
+                "type": "Success",
+                "errors": [],
+                "data": [
+                    {
+                        "post": f"{self.profile3.feed}#{self.reaction2.post_id}",
+                        "emoji": "❤️",
+                        "parent": f"{feed_url}#{self.post2.post_id}",
+                    },
+                    {
+                        "post": f"{self.profile2.feed}#{self.reaction1.post_id}",
+                        "emoji": "👍",
+                        "parent": f"{feed_url}#{self.post1.post_id}",
+                    },
+                ],
+                "meta": {"feed": feed_url, "total": 2},
+                "_links": {
+                    "self": {
+                        "href": "/reactions/?feed=https%3A%2F%2Fexample.com%2Fsocial.org",
+                        "method": "GET",
+                    }
+                },
+            },
+        )
 
         # Then: Should have ETag and Last-Modified headers
         self.assertIn("ETag", response)
@@ -129,6 +137,67 @@ class ReactionsViewTest(TestCase):
         self.assertIn("ETag", response)
         self.assertIn("Last-Modified", response)
 
+    def test_get_reactions_ignores_replies_to_unknown_posts(self):
+        """Test GET /reactions/ only returns reactions to posts the feed has."""
+        # Given: A reaction to a post the feed does not (or no longer) publish
+        Post.objects.create(
+            profile=self.profile3,
+            post_id="2025-01-01T16:00:00+00:00",
+            content="",
+            mood="🔥",
+            reply_to=f"{self.profile1.feed}#2024-01-01T00:00:00+00:00",
+        )
+
+        # When: We request reactions for the profile
+        response = self.client.get(self.reactions_url, {"feed": self.profile1.feed})
+
+        # Then: Only the reactions to its existing posts are returned
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [reaction["emoji"] for reaction in response.data["data"]], ["❤️", "👍"]
+        )
+
+    def test_get_reactions_match_the_feed_url_exactly(self):
+        """Test GET /reactions/ ignores replies to a differently cased feed URL."""
+        # Given: A reaction whose parent only differs from the feed by case
+        Post.objects.create(
+            profile=self.profile3,
+            post_id="2025-01-01T16:00:00+00:00",
+            content="",
+            mood="🔥",
+            reply_to=f"https://EXAMPLE.com/social.org#{self.post1.post_id}",
+        )
+
+        # When: We request reactions for the profile
+        response = self.client.get(self.reactions_url, {"feed": self.profile1.feed})
+
+        # Then: Only the reactions to its exact post URLs are returned
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [reaction["emoji"] for reaction in response.data["data"]], ["❤️", "👍"]
+        )
+
+    def test_get_reactions_query_count_does_not_grow_with_posts(self):
+        """Test GET /reactions/ runs a constant number of queries."""
+        # Given: The profile has many more posts
+        RelayMetadata.get_global_metadata()
+        Post.objects.bulk_create(
+            Post(
+                profile=self.profile1,
+                post_id=f"2025-02-{i + 1:02d}T12:00:00+00:00",
+                content=f"Extra post {i}",
+            )
+            for i in range(20)
+        )
+
+        # When: We request reactions for the profile
+        # Then: Relay metadata and reactions (joined on the feed) take one
+        # query each
+        with self.assertNumQueries(2):
+            response = self.client.get(self.reactions_url, {"feed": self.profile1.feed})
+
+        self.assertEqual(len(response.data["data"]), 2)
+
     def test_get_reactions_nonexistent_profile(self):
         """Test GET /reactions/ returns 404 for nonexistent profile."""
         # Given: A feed URL that doesn't exist
@@ -143,6 +212,20 @@ class ReactionsViewTest(TestCase):
         self.assertIn("Profile not found", response.data["errors"][0])
         self.assertIsNone(response.data["data"])
 
+    def test_get_reactions_nonexistent_profile_is_cached(self):
+        """Test repeated GET /reactions/ for an unknown feed skip the DB."""
+        # Given: A first request for a feed that doesn't exist
+        nonexistent_feed = "https://nonexistent.com/social.org"
+        self.client.get(self.reactions_url, {"feed": nonexistent_feed})
+
+        # When: The same request comes again
+        with self.assertNumQueries(0):
+            response = self.client.get(self.reactions_url, {"feed": nonexistent_feed})
+
+        # Then: The 404 is answered from the cache
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("Profile not found", response.data["errors"][0])
+
     def test_reactions_missing_parameters(self):
         """Test that missing required parameters return 400 error."""
         # Given: Reactions endpoint
@@ -348,3 +431,31 @@ Voting for Option A
         # Then: Verify none of the reactions have POLL_OPTION in their emoji
         for reaction in response.data["data"]:
             self.assertNotIn("POLL_OPTION", reaction["emoji"])
+
+
+class UTF8JSONRendererTest(SimpleTestCase):
+    """Test cases for the UTF-8 JSON renderer."""
+
+    def test_render_keeps_emojis_unescaped(self):
+        """Test emojis are written as UTF-8 instead of \\u escapes."""
+        # Given: Data with an emoji
+        data = {"content": "❤", "count": 1}
+
+        # When: We render it
+        content = UTF8JSONRenderer().render(data)
+
+        # Then: The emoji is in the output as UTF-8
+        self.assertEqual(content, '{"content":"❤","count":1}'.encode("utf-8"))
+
+    def test_render_falls_back_for_lone_surrogates(self):
+        """Test invalid surrogates still render through the json fallback."""
+        # Given: Data with a lone surrogate, which orjson rejects
+        data = {"content": "\ud83d"}
+
+        # When: We render it
+        content = UTF8JSONRenderer().render(data)
+
+        # Then: The surrogate is passed through
+        self.assertEqual(
+            content, '{"content":"\ud83d"}'.encode("utf-8", errors="surrogatepass")
+        )
@@ -2,7 +2,9 @@
 Utility functions for reactions
 """
 
-from app.feeds.models import Post
+from django.db.models import Exists, OuterRef
+
+from app.feeds.models import Post, PollVote
 
 
 def get_reactions_for_post(post_url: str):
@@ -18,7 +20,7 @@ def get_reactions_for_post(post_url: str):
     return (
         Post.objects.filter(reply_to=post_url, mood__isnull=False)
         .exclude(mood="")
-        .exclude(poll_votes__isnull=False)
+        .filter(~Exists(PollVote.objects.filter(post=OuterRef("pk"))))
         .select_related("profile")
         .order_by("-post_id")
     )
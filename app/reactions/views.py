@@ -2,13 +2,45 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Concat
 import logging
+from functools import lru_cache
+from urllib.parse import quote
 
-from app.feeds.models import Profile, Post
+from app.feeds.models import Profile, Post, PollVote
 from app.reactions.renderers import UTF8JSONRenderer
 
 logger = logging.getLogger(__name__)
 
+# Seconds an unknown feed is answered with 404 from the cache
+NOT_FOUND_CACHE_TIMEOUT = 60
+
+
+@lru_cache(maxsize=4096)
+def _build_links(feed_url):
+    """HATEOAS links for a feed. Shared between responses, do not mutate."""
+    # URL encode the feed_url for the self link
+    encoded_feed_url = quote(feed_url, safe="")
+    return {
+        "self": {
+            "href": f"/reactions/?feed={encoded_feed_url}",
+            "method": "GET",
+        }
+    }
+
+
+def _error_response(message, status_code):
+    return Response(
+        {"type": "Error", "errors": [message], "data": None}, status=status_code
+    )
+
+
+def _profile_not_found():
+    return _error_response(
+        "Profile not found for the given feed URL", status.HTTP_404_NOT_FOUND
+    )
+
 
 class ReactionsView(APIView):
     """Get reactions for a specific feed URL"""
@@ -19,70 +51,59 @@ class ReactionsView(APIView):
         feed_url = request.query_params.get("feed")
 
         if not feed_url or not feed_url.strip():
-            return Response(
-                {
-                    "type": "Error",
-                    "errors": ["Feed URL parameter is required"],
-                    "data": None,
-                },
-                status=status.HTTP_400_BAD_REQUEST,
+            return _error_response(
+                "Feed URL parameter is required", status.HTTP_400_BAD_REQUEST
             )
 
         feed_url = feed_url.strip()
 
-        # Try to get reactions from cache first
+        # Try to get reactions (or a recent "not found") from cache first
         cache_key = f"reactions_{feed_url}"
-        cached_response = cache.get(cache_key)
-
-        if cached_response is not None:
-            return Response(cached_response, status=status.HTTP_200_OK)
-
-        # Check if the profile exists
-        try:
-            profile = Profile.objects.get(feed=feed_url)
-        except Profile.DoesNotExist:
-            return Response(
-                {
-                    "type": "Error",
-                    "errors": ["Profile not found for the given feed URL"],
-                    "data": None,
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        not_found_key = f"{cache_key}:not_found"
+        cached = cache.get_many([cache_key, not_found_key])
+
+        if cache_key in cached:
+            return Response(cached[cache_key], status=status.HTTP_200_OK)
+        if cached.get(not_found_key):
+            return _profile_not_found()
 
         # Get all reactions to this profile's posts
         # A reaction is a post with mood != '' and reply_to pointing to this profile's posts
 
-        # First, get all post IDs from this profile
-        profile_post_ids = list(profile.posts.values_list("post_id", flat=True))
-
-        # Build the reply_to patterns (feed#post_id)
-        reply_to_patterns = [f"{feed_url}#{post_id}" for post_id in profile_post_ids]
+        # reply_to is feed#post_id: match it exactly against the URLs of this
+        # profile's posts, built in the database so the reply_to index is used
+        post_urls = (
+            Post.objects.filter(profile__feed=feed_url)
+            .annotate(url=Concat(Value(f"{feed_url}#"), "post_id"))
+            .values("url")
+        )
 
         # Find all posts that reply to any of this profile's posts and have a mood
         # Exclude poll votes (posts with poll_votes relationship)
         reactions = (
-            Post.objects.filter(reply_to__in=reply_to_patterns, mood__isnull=False)
+            Post.objects.filter(reply_to__in=post_urls, mood__isnull=False)
             .exclude(mood="")
-            .exclude(poll_votes__isnull=False)
-            .select_related("profile")
+            .filter(~Exists(PollVote.objects.filter(post=OuterRef("pk"))))
             .order_by("-post_id")
+            .values_list("profile__feed", "post_id", "mood", "reply_to")
         )
 
-        # Build data according to README spec
-        reactions_data = []
-        for reaction in reactions:
-            reaction_data = {
-                "post": f"{reaction.profile.feed}#{reaction.post_id}",
-                "emoji": reaction.mood,
-                "parent": reaction.reply_to,
+        # Build data according to README spec, streaming rows from the cursor
+        # instead of keeping them in the queryset cache
+        reactions_data = [
+            {
+                "post": f"{feed}#{post_id}",
+                "emoji": mood,
+                "parent": reply_to,
             }
-            reactions_data.append(reaction_data)
-
-        # URL encode the feed_url for the self link
-        from urllib.parse import quote
+            for feed, post_id, mood, reply_to in reactions.iterator(chunk_size=2000)
+        ]
 
-        encoded_feed_url = quote(feed_url, safe="")
+        # Only look the profile up when there is nothing to show for it
+        if not reactions_data and not Profile.objects.filter(feed=feed_url).exists():
+            # Remember it for a while so unknown feeds do not hit the DB again
+            cache.set(not_found_key, True, NOT_FOUND_CACHE_TIMEOUT)
+            return _profile_not_found()
 
         response_data = {
             "type": "Success",
@@ -92,12 +113,7 @@ class ReactionsView(APIView):
                 "feed": feed_url,
                 "total": len(reactions_data),
             },
-            "_links": {
-                "self": {
-                    "href": f"/reactions/?feed={encoded_feed_url}",
-                    "method": "GET",
-                }
-            },
+            "_links": _build_links(feed_url),
         }
 
         # Cache permanently (will be cleared by scan_feeds task)
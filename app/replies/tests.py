@@ -1,4 +1,6 @@
-from django.test import TestCase
+from urllib.parse import quote, urlencode
+
+from django.test import SimpleTestCase, TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 
@@ -8,139 +10,177 @@ from app.feeds.models import Profile, Post
 class RepliesViewTest(TestCase):
     """Test cases for the RepliesView API using Given/When/Then structure."""
 
-    def setUp(self):
-        self.client = APIClient()
-        self.replies_url = "/replies/"
+    client_class = APIClient
 
+    @classmethod
+    def setUpTestData(cls):
         # Create test profiles
-        self.profile1 = Profile.objects.create(
-            feed="https://example.com/social.org",
-            title="Example Profile",
-            nick="example_user",
-            description="Test profile 1",
-        )
-        self.profile2 = Profile.objects.create(
-            feed="https://test.com/social.org",
-            title="Test Profile",
-            nick="test_user",
-            description="Test profile 2",
-        )
-        self.profile3 = Profile.objects.create(
-            feed="https://third.com/social.org",
-            title="Third Profile",
-            nick="third_user",
-            description="Test profile 3",
+        cls.profile1, cls.profile2, cls.profile3 = Profile.objects.bulk_create(
+            [
+                Profile(
+                    feed="https://example.com/social.org",
+                    title="Example Profile",
+                    nick="example_user",
+                    description="Test profile 1",
+                ),
+                Profile(
+                    feed="https://test.com/social.org",
+                    title="Test Profile",
+                    nick="test_user",
+                    description="Test profile 2",
+                ),
+                Profile(
+                    feed="https://third.com/social.org",
+                    title="Third Profile",
+                    nick="third_user",
+                    description="Test profile 3",
+                ),
+            ]
         )
 
-        # Create original post
-        self.original_post = Post.objects.create(
-            profile=self.profile1,
-            post_id="2025-01-01T12:00:00+00:00",
-            content="This is the original post",
+        # Create the original post, two direct replies to it, two nested
+        # replies to the first reply (replies to replies) and a deeply nested
+        # reply. reply_to only needs the feed and post_id of the parent.
+        (
+            cls.original_post,
+            cls.reply1,
+            cls.reply2,
+            cls.nested_reply1,
+            cls.nested_reply2,
+            cls.deep_nested_reply,
+        ) = Post.objects.bulk_create(
+            [
+                Post(
+                    profile=cls.profile1,
+                    post_id="2025-01-01T12:00:00+00:00",
+                    content="This is the original post",
+                ),
+                Post(
+                    profile=cls.profile2,
+                    post_id="2025-01-01T13:00:00+00:00",
+                    content="First reply to original",
+                    reply_to=f"{cls.profile1.feed}#2025-01-01T12:00:00+00:00",
+                ),
+                Post(
+                    profile=cls.profile3,
+                    post_id="2025-01-01T14:00:00+00:00",
+                    content="Second reply to original",
+                    reply_to=f"{cls.profile1.feed}#2025-01-01T12:00:00+00:00",
+                ),
+                Post(
+                    profile=cls.profile3,
+                    post_id="2025-01-01T15:00:00+00:00",
+                    content="Reply to first reply",
+                    reply_to=f"{cls.profile2.feed}#2025-01-01T13:00:00+00:00",
+                ),
+                Post(
+                    profile=cls.profile1,
+                    post_id="2025-01-01T16:00:00+00:00",
+                    content="Another reply to first reply",
+                    reply_to=f"{cls.profile2.feed}#2025-01-01T13:00:00+00:00",
+                ),
+                Post(
+                    profile=cls.profile2,
+                    post_id="2025-01-01T17:00:00+00:00",
+                    content="Reply to nested reply",
+                    reply_to=f"{cls.profile3.feed}#2025-01-01T15:00:00+00:00",
+                ),
+            ]
         )
 
-        # Create direct replies to original post
-        self.reply1 = Post.objects.create(
-            profile=self.profile2,
-            post_id="2025-01-01T13:00:00+00:00",
-            content="First reply to original",
-            reply_to=f"{self.profile1.feed}#{self.original_post.post_id}",
+        # Post URLs (feed#post_id) as used by the API
+        cls.original_post_url = f"{cls.profile1.feed}#{cls.original_post.post_id}"
+        cls.reply1_url = f"{cls.profile2.feed}#{cls.reply1.post_id}"
+        cls.reply2_url = f"{cls.profile3.feed}#{cls.reply2.post_id}"
+        cls.nested_reply1_url = f"{cls.profile3.feed}#{cls.nested_reply1.post_id}"
+        cls.nested_reply2_url = f"{cls.profile1.feed}#{cls.nested_reply2.post_id}"
+        cls.deep_nested_reply_url = (
+            f"{cls.profile2.feed}#{cls.deep_nested_reply.post_id}"
         )
 
-        self.reply2 = Post.objects.create(
-            profile=self.profile3,
-            post_id="2025-01-01T14:00:00+00:00",
-            content="Second reply to original",
-            reply_to=f"{self.profile1.feed}#{self.original_post.post_id}",
-        )
-
-        # Create nested replies (replies to replies)
-        self.nested_reply1 = Post.objects.create(
-            profile=self.profile3,
-            post_id="2025-01-01T15:00:00+00:00",
-            content="Reply to first reply",
-            reply_to=f"{self.profile2.feed}#{self.reply1.post_id}",
-        )
-
-        self.nested_reply2 = Post.objects.create(
-            profile=self.profile1,
-            post_id="2025-01-01T16:00:00+00:00",
-            content="Another reply to first reply",
-            reply_to=f"{self.profile2.feed}#{self.reply1.post_id}",
-        )
+    def setUp(self):
+        self.replies_url = "/replies/"
 
-        # Create deeply nested reply
-        self.deep_nested_reply = Post.objects.create(
-            profile=self.profile2,
-            post_id="2025-01-01T17:00:00+00:00",
-            content="Reply to nested reply",
-            reply_to=f"{self.profile3.feed}#{self.nested_reply1.post_id}",
-        )
+    @staticmethod
+    def _index_tree(data):
+        """Index every node of a replies tree by its post URL."""
+        nodes = {}
+        stack = list(data)
+        while stack:
+            node = stack.pop()
+            nodes[node["post"]] = node
+            stack.extend(node["children"])
+        return nodes
 
     def test_get_replies_success(self):
         """Test GET /replies/?post=<post_url> returns replies tree structure."""
         # Given: A post with replies exists
-        post_url = f"{self.profile1.feed}#{self.original_post.post_id}"
+        post_url = self.original_post_url
 
         # When: We request replies for the post
         response = self.client.get(self.replies_url, {"post": post_url})
 
-        # Then: We should get replies successfully
+        # Then: We should get the whole replies tree, ordered by creation
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertEqual(response.data["errors"], [])
-
-        # Then: Response should contain tree structure data
-        data = response.data["data"]
-        self.assertIsInstance(data, list)
-        self.assertEqual(len(data), 2)  # 2 direct replies
-
-        # Then: Each reply should have post and children fields
-        for reply in data:
-            self.assertIn("post", reply)
-            self.assertIn("children", reply)
-            self.assertIsInstance(reply["children"], list)
-
-        # Then: Meta should contain correct information
-        meta = response.data["meta"]
-        self.assertEqual(meta["parent"], post_url)
+        self.assertEqual(
+            response.json(),
+            {
+                "type": "Success",
+                "errors": [],
+                "data": [
+                    {
+                        "post": self.reply1_url,
+                        "children": [
+                            {
+                                "post": self.nested_reply1_url,
+                                "children": [
+                                    {
+                                        "post": self.deep_nested_reply_url,
+                                        "children": [],
+                                        "moods": [],
+                                    }
+                                ],
+                                "moods": [],
+                            },
+                            {
+                                "post": self.nested_reply2_url,
+                                "children": [],
+                                "moods": [],
+                            },
+                        ],
+                        "moods": [],
+                    },
+                    {"post": self.reply2_url, "children": [], "moods": []},
+                ],
+                "meta": {"parent": post_url, "moods": [], "parentChain": []},
+                "_links": {
+                    "self": {
+                        "href": f"/replies/?post={quote(post_url, safe='')}",
+                        "method": "GET",
+                    }
+                },
+            },
+        )
 
         # Then: Should have ETag and Last-Modified headers
-        self.assertIn("ETag", response)
-        self.assertIn("Last-Modified", response)
+        self.assertLessEqual({"ETag", "Last-Modified"}, set(response.headers))
 
     def test_get_replies_nested_structure(self):
         """Test that replies are properly nested in tree structure."""
         # Given: A post with nested replies exists
-        post_url = f"{self.profile1.feed}#{self.original_post.post_id}"
+        post_url = self.original_post_url
 
         # When: We request replies for the post
         response = self.client.get(self.replies_url, {"post": post_url})
 
         # Then: We should get properly nested structure
-        data = response.data["data"]
-
-        # Find the first reply which has children
-        reply_with_children = None
-        for reply in data:
-            if reply["post"] == f"{self.profile2.feed}#{self.reply1.post_id}":
-                reply_with_children = reply
-                break
+        nodes = self._index_tree(response.data["data"])
 
-        self.assertIsNotNone(reply_with_children)
-        self.assertEqual(len(reply_with_children["children"]), 2)  # 2 nested replies
+        # Then: The first reply has its 2 nested replies
+        self.assertEqual(len(nodes[self.reply1_url]["children"]), 2)
 
         # Then: Check that nested reply has its own child
-        nested_reply_with_child = None
-        for child in reply_with_children["children"]:
-            if child["post"] == f"{self.profile3.feed}#{self.nested_reply1.post_id}":
-                nested_reply_with_child = child
-                break
-
-        self.assertIsNotNone(nested_reply_with_child)
-        self.assertEqual(
-            len(nested_reply_with_child["children"]), 1
-        )  # 1 deep nested reply
+        self.assertEqual(len(nodes[self.nested_reply1_url]["children"]), 1)
 
     def test_get_replies_nonexistent_post(self):
         """Test GET /replies/ returns 404 for nonexistent post."""
@@ -187,12 +227,13 @@ class RepliesViewTest(TestCase):
 
         # Then: We should get empty array
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertEqual(response.data["errors"], [])
-        self.assertEqual(response.data["data"], [])
+        payload = response.data
+        self.assertEqual(payload["type"], "Success")
+        self.assertEqual(payload["errors"], [])
+        self.assertEqual(payload["data"], [])
 
         # Then: Meta should still be present
-        meta = response.data["meta"]
+        meta = payload["meta"]
         self.assertEqual(meta["parent"], post_url)
 
         # Then: Should have ETag and Last-Modified headers
@@ -202,74 +243,31 @@ class RepliesViewTest(TestCase):
     def test_replies_response_format_compliance(self):
         """Test replies response format compliance with README specification."""
         # Given: A post with replies exists
-        post_url = f"{self.profile1.feed}#{self.original_post.post_id}"
+        post_url = self.original_post_url
 
         # When: We request replies
         response = self.client.get(self.replies_url, {"post": post_url})
 
         # Then: Response should match expected format
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("type", response.data)
-        self.assertIn("errors", response.data)
-        self.assertIn("data", response.data)
-        self.assertIn("meta", response.data)
-        self.assertEqual(response.data["type"], "Success")
-        self.assertIsInstance(response.data["errors"], list)
-        self.assertIsInstance(response.data["data"], list)
-        self.assertIsInstance(response.data["meta"], dict)
+        payload = response.data
+        self.assertIn("type", payload)
+        self.assertIn("errors", payload)
+        self.assertIn("data", payload)
+        self.assertIn("meta", payload)
+        self.assertEqual(payload["type"], "Success")
+        self.assertIsInstance(payload["errors"], list)
+        self.assertIsInstance(payload["data"], list)
+        self.assertIsInstance(payload["meta"], dict)
 
         # Then: Data should be array of reply trees
-        data = response.data["data"]
-        for reply_tree in data:
+        for reply_tree in payload["data"]:
             self.assertIn("post", reply_tree)
             self.assertIn("children", reply_tree)
             self.assertIn("moods", reply_tree)
             self.assertIsInstance(reply_tree["children"], list)
             self.assertIsInstance(reply_tree["moods"], list)
 
-    def test_replies_view_methods_allowed(self):
-        """Test that only GET method is allowed on replies endpoint."""
-        # Given: A valid replies URL
-        params = {"post": f"{self.profile1.feed}#{self.original_post.post_id}"}
-
-        # When: We try different HTTP methods
-        post_response = self.client.post(self.replies_url, params)
-        put_response = self.client.put(self.replies_url, params)
-        delete_response = self.client.delete(self.replies_url, params)
-        patch_response = self.client.patch(self.replies_url, params)
-
-        # Then: Unsupported methods should return 405
-        self.assertEqual(post_response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-        self.assertEqual(put_response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-        self.assertEqual(
-            delete_response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
-        )
-        self.assertEqual(patch_response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
-
-    def test_replies_missing_parameters(self):
-        """Test that missing required parameters return 400 error."""
-        # Given: Replies endpoint
-
-        # When: We request without required parameters
-        response = self.client.get(self.replies_url)
-
-        # Then: Should return 400 error
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data["type"], "Error")
-        self.assertIn("required", response.data["errors"][0])
-
-    def test_replies_invalid_post_format(self):
-        """Test that invalid post URL format returns 400 error."""
-        # Given: Replies endpoint
-
-        # When: We request with invalid post format (no # separator)
-        response = self.client.get(self.replies_url, {"post": "invalid_url_format"})
-
-        # Then: Should return 400 error
-        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(response.data["type"], "Error")
-        self.assertIn("Invalid post URL format", response.data["errors"][0])
-
     def test_replies_with_moods(self):
         """Test replies with mood reactions are properly included."""
         # Given: An original post
@@ -409,18 +407,19 @@ class RepliesViewTest(TestCase):
         # Then: meta should have parentChain
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("meta", response.data)
-        self.assertIn("parentChain", response.data["meta"])
-        self.assertIsInstance(response.data["meta"]["parentChain"], list)
+        meta = response.data["meta"]
+        self.assertIn("parentChain", meta)
+        self.assertIsInstance(meta["parentChain"], list)
 
         # Should have 1 parent (the root)
-        parent_chain = response.data["meta"]["parentChain"]
+        parent_chain = meta["parentChain"]
         self.assertEqual(len(parent_chain), 1)
         self.assertEqual(parent_chain[0], f"{self.profile1.feed}#{root_post.post_id}")
 
     def test_parent_chain_empty_for_root_post(self):
         """Test that parentChain is empty array for root posts."""
         # Given: A root post (no parents)
-        post_url = f"{self.profile1.feed}#{self.original_post.post_id}"
+        post_url = self.original_post_url
 
         # When: We request replies for the root post
         response = self.client.get(self.replies_url, {"post": post_url})
@@ -475,24 +474,70 @@ class RepliesViewTest(TestCase):
     def test_nodes_do_not_have_parent_chain(self):
         """Test that tree nodes do not include parentChain field."""
         # Given: A post with replies
-        post_url = f"{self.profile1.feed}#{self.original_post.post_id}"
+        post_url = self.original_post_url
 
         # When: We request replies
         response = self.client.get(self.replies_url, {"post": post_url})
 
-        # Then: Data nodes should not have parentChain field
+        # Then: No node of the tree should have a parentChain field
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        data = response.data["data"]
+        nodes = self._index_tree(response.data["data"])
+
+        # Only post, children, and moods
+        self.assertEqual(
+            {post: set(node) for post, node in nodes.items()},
+            dict.fromkeys(nodes, {"post", "children", "moods"}),
+        )
+
+
+class RepliesViewValidationTest(SimpleTestCase):
+    """Test cases for RepliesView requests rejected before any database lookup."""
+
+    client_class = APIClient
+
+    def setUp(self):
+        self.replies_url = "/replies/"
+
+    def test_replies_view_methods_allowed(self):
+        """Test that only GET method is allowed on replies endpoint."""
+        # Given: A valid replies URL
+        params = urlencode(
+            {"post": "https://example.com/social.org#2025-01-01T12:00:00+00:00"}
+        )
+
+        # When: We try different HTTP methods
+        # Then: Unsupported methods should return 405
+        for method in ("post", "put", "delete", "patch"):
+            with self.subTest(method=method):
+                response = getattr(self.client, method)(
+                    self.replies_url,
+                    data=params,
+                    content_type="application/x-www-form-urlencoded",
+                )
+                self.assertEqual(
+                    response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+                )
+
+    def test_replies_missing_parameters(self):
+        """Test that missing required parameters return 400 error."""
+        # Given: Replies endpoint
+
+        # When: We request without required parameters
+        response = self.client.get(self.replies_url)
+
+        # Then: Should return 400 error
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["type"], "Error")
+        self.assertIn("required", response.data["errors"][0])
+
+    def test_replies_invalid_post_format(self):
+        """Test that invalid post URL format returns 400 error."""
+        # Given: Replies endpoint
 
-        for reply in data:
-            self.assertNotIn("parentChain", reply)
-            self.assertNotIn("parent_chain", reply)
-            # Only post, children, and moods
-            self.assertIn("post", reply)
-            self.assertIn("children", reply)
-            self.assertIn("moods", reply)
-
-            # Check nested replies also don't have parentChain
-            for child in reply["children"]:
-                self.assertNotIn("parentChain", child)
-                self.assertNotIn("parent_chain", child)
+        # When: We request with invalid post format (no # separator)
+        response = self.client.get(self.replies_url, {"post": "invalid_url_format"})
+
+        # Then: Should return 400 error
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["type"], "Error")
+        self.assertIn("Invalid post URL format", response.data["errors"][0])